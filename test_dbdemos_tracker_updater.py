@@ -0,0 +1,87 @@
+"""Tests for the tracker initialization splicing in dbdemos_tracker_updater."""
+
+import ast
+
+import pytest
+
+from dbdemos_tracker_updater import DBDemosTrackerUpdater, ScanResult
+
+
+@pytest.fixture
+def updater():
+    return DBDemosTrackerUpdater('test-token', cache_dir=None)
+
+
+def add_init(updater, tmp_path, content):
+    """Run add_tracker_init_to_file on content and return the rewritten source."""
+    file_path = tmp_path / 'main.py'
+    file_path.write_text(content, encoding='utf-8')
+    assert updater.add_tracker_init_to_file(str(file_path), ScanResult())
+    return file_path.read_text(encoding='utf-8')
+
+
+def assert_import_before_init(source):
+    """The result must parse and import the tracker before initializing it."""
+    ast.parse(source)
+    assert source.index('import dbdemos_tracker') < source.index('dbdemos_tracker.initialize()')
+
+
+@pytest.mark.parametrize('content', ['import os', '"""Docstring."""', 'import os\n'])
+def test_import_precedes_appended_init(updater, tmp_path, content):
+    assert_import_before_init(add_init(updater, tmp_path, content))
+
+
+def test_init_at_start_of_main_guard(updater, tmp_path):
+    source = add_init(updater, tmp_path, (
+        'import os\n'
+        '\n'
+        'if __name__ == "__main__":\n'
+        '\tprint(os.getcwd())\n'
+    ))
+
+    assert_import_before_init(source)
+    assert 'if __name__ == "__main__":\n\tdbdemos_tracker.initialize()\n\tprint' in source
+
+
+def test_init_before_decorated_statement_in_main(updater, tmp_path):
+    source = add_init(updater, tmp_path, (
+        'import click\n'
+        '\n'
+        'def main():\n'
+        '    @click.command()\n'
+        '    @click.option("--name")\n'
+        '    def cli(name):\n'
+        '        pass\n'
+        '    cli()\n'
+    ))
+
+    assert_import_before_init(source)
+    assert 'def main():\n    dbdemos_tracker.initialize()\n    @click.command()\n' in source
+
+
+def test_init_before_decorated_statement_in_main_guard(updater, tmp_path):
+    source = add_init(updater, tmp_path, (
+        'import functools\n'
+        '\n'
+        'if __name__ == "__main__":\n'
+        '    @functools.lru_cache()\n'
+        '    def run():\n'
+        '        pass\n'
+        '    run()\n'
+    ))
+
+    assert_import_before_init(source)
+    assert 'if __name__ == "__main__":\n    dbdemos_tracker.initialize()\n    @functools.lru_cache()\n' in source
+
+
+def test_byte_order_mark_is_kept(updater, tmp_path):
+    source = add_init(updater, tmp_path, (
+        '\ufeffimport os\n'
+        '\n'
+        'def main():\n'
+        '    print(os.getcwd())\n'
+    ))
+
+    assert source.startswith('\ufeffimport os\nimport dbdemos_tracker\n')
+    assert_import_before_init(source[1:])
+    assert 'def main():\n    dbdemos_tracker.initialize()\n    print' in source